@@ -3,119 +3,325 @@
 VS Code Python workspace setup script (Windows/macOS/Linux)
 
 Usage:
-  python setup_workspace.py
+  python setup_workspace.py [--force] [--quick-scan]
 """
 
-import argparse
+import functools
+import hashlib
 import json
-import platform
+import os
 import shutil
 import subprocess
 import sys
+import threading
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, FrozenSet, Set, Tuple
 
+try:
+    import orjson
+except ImportError:  # optional speed-up; fall back to the stdlib encoder
+    orjson = None  # type: ignore[assignment]
 
-def run(cmd: List[str], cwd: Optional[Path] = None, check: bool = True) -> int:
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize `obj` as 2-space indented UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        return bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+
+# Where initial_conditions_default.yaml usually lives; all that --quick-scan checks.
+LIKELY_DIRS: Tuple[str, ...] = ("", "config", "configs", "settings")
+# Directories never searched for initial_conditions_default.yaml.
+SKIP_DIRS: FrozenSet[str] = frozenset(
+    {
+        ".git", ".venv", "venv", "node_modules", "__pycache__",
+        ".mypy_cache", ".pytest_cache", "build", "dist",
+    }
+)
+_IS_WINDOWS: bool = sys.platform.startswith("win")
+
+# Everything in settings.json except the interpreter path, which depends on the OS.
+_BASE_SETTINGS: Dict[str, Any] = {
+    "python.terminal.activateEnvironment": True,
+    "terminal.integrated.env.windows": {
+        "VIRTUAL_ENV": "${workspaceFolder}\\.venv",
+        "PATH": "${workspaceFolder}\\.venv\\Scripts;${env:PATH}",
+    },
+    "terminal.integrated.env.osx": {
+        "VIRTUAL_ENV": "${workspaceFolder}/.venv",
+        "PATH": "${workspaceFolder}/.venv/bin:${env:PATH}",
+    },
+    "terminal.integrated.env.linux": {
+        "VIRTUAL_ENV": "${workspaceFolder}/.venv",
+        "PATH": "${workspaceFolder}/.venv/bin:${env:PATH}",
+    },
+    # Copilot restrictions
+    "github.copilot.enable": {
+        "*": False,
+        "plaintext": False,
+        "markdown": False,
+        "scminput": False
+    },
+    "github.copilot.inlineSuggest.enable": False,
+    "github.copilot.nextEditSuggestions.enabled": False,
+    "editor.inlineSuggest.edits.allowCodeShifting": "never",
+    "chat.commandCenter.enabled": False,
+    "chat.agent.enabled": False,
+    "chat.mcp.enabled": False,
+    "github.copilot.chat.enable": False,
+    "github.copilot.chat.codesearch.enabled": False,
+    "github.copilot.chat.editor.temporalContext.enabled": False,
+    "github.copilot.chat.edits.suggestRelatedFilesFromGitHistory": False,
+    "github.copilot.chat.newWorkspaceCreation.enabled": False,
+    "github.copilot.chat.startDebugging.enabled": False,
+    "github.copilot.chat.copilotDebugCommand.enabled": False,
+    "github.copilot.chat.generateTests.codeLens": False,
+    "github.copilot.chat.setupTests.enabled": False,
+    "github.copilot.chat.codeGeneration.useInstructionFiles": False,
+    "chat.promptFiles": False,
+    "chat.modeFilesLocations": {},
+    "workbench.settings.showAISearchToggle": False,
+    "search.searchView.semanticSearchBehavior": "manual",
+}
+
+# launch.json and extensions.json never vary, so serialize them once at import.
+_LAUNCH_JSON_BYTES: bytes = _dumps({
+    "version": "0.2.0",
+    "configurations": [
+        {
+            "name": "Python: Current File",
+            "type": "debugpy",
+            "request": "launch",
+            "program": "${file}",
+            "console": "integratedTerminal",
+            "justMyCode": True,
+            "env": {"VIRTUAL_ENV": "${workspaceFolder}/.venv"},
+        }
+    ],
+})
+
+_EXTENSIONS_JSON_BYTES: bytes = _dumps({
+    "recommendations": ["ms-python.pylint"],
+    "unwantedRecommendations": ["GitHub.copilot", "GitHub.copilot-chat"],
+})
+
+
+_print_lock: threading.Lock = threading.Lock()
+
+
+def log(msg: str) -> None:
+    """Print one line of progress; safe to call from the setup worker thread."""
+    with _print_lock:
+        print(msg, flush=True)
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """
+    Atomically write `data` to `path` unless the file already holds exactly
+    those bytes. Returns True if the file was (re)written.
+    """
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    tmp: Path = path.with_name(path.name + ".tmp")
+    _ = tmp.write_bytes(data)
+    _ = tmp.replace(path)
+    return True
+
+
+def report_write(path: Path, changed: bool, repo_root: Path) -> None:
+    """Print whether a generated config file was written or left untouched."""
+    if changed:
+        log(f"✅ Wrote {os.path.relpath(path, repo_root)}")
+    else:
+        log(f"ℹ️ {os.path.relpath(path, repo_root)} unchanged; not rewritten.")
+
+
+def run(
+    cmd: List[str],
+    cwd: Optional[Path] = None,
+    check: bool = True,
+    env: Optional[Dict[str, str]] = None,
+) -> int:
     """Run a subprocess command and return its exit code."""
-    print(f"→ Running: {' '.join(cmd)}" + (f"  (cwd={cwd})" if cwd else ""))
-    result: subprocess.CompletedProcess[Any] = subprocess.run(cmd, cwd=cwd, check=check)
+    log(f"→ Running: {' '.join(cmd)}" + (f"  (cwd={cwd})" if cwd else ""))
+    result: subprocess.CompletedProcess[Any] = subprocess.run(cmd, cwd=cwd, check=check, env=env)
     return int(result.returncode)
 
 
 def detect_repo_root(start: Path) -> Optional[Path]:
     """Walk upward from a starting path to find the nearest Git repository root."""
-    p: Path = start.resolve()
+    p: str = os.fspath(start.resolve())
     for _ in range(5):
-        if (p / ".git").is_dir():
-            return p
-        if p.parent == p:
+        if os.path.isdir(os.path.join(p, ".git")):
+            return Path(p)
+        parent: str = os.path.dirname(p)
+        if parent == p:
             break
-        p = p.parent
+        p = parent
     return None
 
 
 def ensure_secrets(repo_root: Path) -> None:
     """Ensure an empty `secrets.toml` exists at the repository root."""
     secrets: Path = repo_root / "secrets.toml"
-    if not secrets.exists():
-        _ = secrets.write_text("", encoding="utf-8")
-        print(f"✅ Created empty {secrets.relative_to(repo_root)}")
-    else:
-        print(f"ℹ️ {secrets.relative_to(repo_root)} already exists; leaving it as-is.")
+    try:
+        secrets.open("xb").close()
+        log(f"✅ Created empty {secrets.name}")
+    except FileExistsError:
+        log(f"ℹ️ {secrets.name} already exists; leaving it as-is.")
 
 
-def copy_initial_conditions(repo_root: Path) -> None:
+def _iter_named(root: Path, name: str) -> Iterator[Tuple[Path, FrozenSet[str]]]:
+    """
+    Yield every file called `name` below `root`, skipping `SKIP_DIRS`, together
+    with the names of its sibling files. Uses an explicit stack over
+    `os.scandir` so each directory costs one listing and no per-entry `Path`
+    objects are built for non-matches.
+    """
+    stack: List[str] = [os.fspath(root)]
+    while stack:
+        current: str = stack.pop()
+        files: Set[str] = set()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS:
+                            stack.append(entry.path)
+                    else:
+                        files.add(entry.name)
+        except OSError:
+            continue
+        if name in files:
+            yield Path(os.path.join(current, name)), frozenset(files)
+
+
+def copy_initial_conditions(repo_root: Path, deep: bool = True) -> None:
     """
     Find all `initial_conditions_default.yaml` files in the repo and copy them
     to `initial_conditions.yaml` in the same directory if not already present.
+    With `deep=False`, only the conventional `LIKELY_DIRS` are checked.
     """
-    matches: List[Path] = list(repo_root.rglob("initial_conditions_default.yaml"))
+    name: str = "initial_conditions_default.yaml"
+    matches: List[Tuple[Path, FrozenSet[str]]]
+    if deep:
+        matches = list(_iter_named(repo_root, name))
+    else:
+        # Sibling names are unknown here; the exclusive open below still guards dst.
+        matches = [
+            (repo_root / d / name, frozenset())
+            for d in LIKELY_DIRS
+            if os.path.isfile(repo_root / d / name)
+        ]
     if not matches:
-        print("ℹ️ No initial_conditions_default.yaml found anywhere; skipping copy.")
+        log("ℹ️ No initial_conditions_default.yaml found anywhere; skipping copy.")
         return
 
-    for src in matches:
-        dst: Path = src.with_name("initial_conditions.yaml")
-        if not dst.exists():
-            shutil.copy2(src, dst)
-            print(f"✅ Copied {src.relative_to(repo_root)} → {dst.name}")
-        else:
-            print(f"ℹ️ {dst.relative_to(repo_root)} already exists; leaving it as-is.")
-
-
+    for src, siblings in matches:
+        dst: Path = Path(os.path.join(os.path.dirname(src), "initial_conditions.yaml"))
+        if dst.name in siblings:
+            log(f"ℹ️ {os.path.relpath(dst, repo_root)} already exists; leaving it as-is.")
+            continue
+        try:
+            # "xb" fails if dst exists, so no separate exists() probe is needed.
+            with src.open("rb") as fsrc, dst.open("xb") as fdst:
+                shutil.copyfileobj(fsrc, fdst)
+        except FileExistsError:
+            log(f"ℹ️ {os.path.relpath(dst, repo_root)} already exists; leaving it as-is.")
+            continue
+        shutil.copystat(src, dst)
+        log(f"✅ Copied {os.path.relpath(src, repo_root)} → {dst.name}")
+
+
+@functools.lru_cache(maxsize=None)
 def python_in_venv(repo_root: Path) -> Path:
     """Return the path to the Python executable inside `.venv` for this OS."""
-    system_name: str = platform.system().lower()
-    if system_name.startswith("win"):
+    if _IS_WINDOWS:
         return repo_root / ".venv" / "Scripts" / "python.exe"
     else:
         return repo_root / ".venv" / "bin" / "python"
 
 
-def create_venv_and_install(repo_root: Path) -> None:
-    """Create `.venv` if missing and install dependencies from requirements.txt."""
+def create_venv_and_install(repo_root: Path, force: bool = False) -> None:
+    """
+    Create `.venv` if missing and install dependencies from requirements.txt.
+    The install is skipped when requirements.txt is unchanged since the last
+    one, unless `force` is set.
+    """
     venv_python: Path = python_in_venv(repo_root)
     venv_dir: Path = venv_python.parent.parent
+    uv: Optional[str] = shutil.which("uv")
 
     if not venv_dir.exists():
         base_py: Path = Path(sys.executable)
-        print(f"Creating venv with {base_py}")
-        run([str(base_py), "-m", "venv", str(venv_dir)])
-        print(f"✅ Created virtual environment at {venv_dir.relative_to(repo_root)}")
+        log(f"Creating venv with {base_py}")
+        if uv:
+            # --seed keeps pip in the venv, matching what `python -m venv` provides.
+            run([uv, "venv", "--seed", "--python", str(base_py), str(venv_dir)])
+        elif _IS_WINDOWS:
+            run([str(base_py), "-m", "venv", str(venv_dir)])
+        else:
+            # Same as `python -m venv`, minus starting a second interpreter.
+            import venv
+
+            venv.EnvBuilder(with_pip=True, symlinks=True).create(str(venv_dir))
+        log(f"✅ Created virtual environment at {venv_dir.name}")
     else:
-        print(f"ℹ️ Virtual environment already exists at {venv_dir.relative_to(repo_root)}")
+        log(f"ℹ️ Virtual environment already exists at {venv_dir.name}")
 
     req: Path = repo_root / "requirements.txt"
     if req.exists():
-        print("Installing requirements...")
-        _ = run(
-            [
-                str(venv_python),
-                "-m",
-                "pip",
-                "install",
-                "--upgrade",
-                "pip",
-                "wheel",
-                "setuptools"
-            ]
-        )
-        _ = run([str(venv_python), "-m", "pip", "install", "-r", str(req)])
-        print("✅ Installed requirements")
+        digest: str = hashlib.sha256(req.read_bytes()).hexdigest()
+        marker: Path = venv_dir / ".req.sha256"
+        try:
+            if not force and marker.read_text(encoding="utf-8") == digest:
+                log("ℹ️ requirements.txt unchanged since last install; skipping.")
+                return
+        except FileNotFoundError:
+            pass
+
+        log("Installing requirements...")
+        if uv:
+            # uv resolves and downloads in parallel and needs no pip upgrade.
+            _ = run([uv, "pip", "install", "--python", str(venv_python), "-r", str(req)])
+        else:
+            pip_env: Dict[str, str] = {
+                **os.environ,
+                "PIP_DISABLE_PIP_VERSION_CHECK": "1",
+                "PIP_NO_INPUT": "1",
+            }
+            # One pip process for both the tooling upgrade and the requirements,
+            # so interpreter startup and index lookups are only paid once.
+            _ = run(
+                [
+                    str(venv_python),
+                    "-m",
+                    "pip",
+                    "install",
+                    "--prefer-binary",
+                    "--upgrade",
+                    "pip",
+                    "wheel",
+                    "setuptools",
+                    "-r",
+                    str(req),
+                ],
+                env=pip_env,
+            )
+        _ = marker.write_text(digest, encoding="utf-8")
+        log("✅ Installed requirements")
     else:
-        print("ℹ️ No requirements.txt found; skipping dependency install.")
+        log("ℹ️ No requirements.txt found; skipping dependency install.")
 
 
 def write_extensions_json(vscode_dir: Path) -> None:
     """Write `.vscode/extensions.json` with pylint recommendation and Copilot discouraged."""
     path: Path = vscode_dir / "extensions.json"
-    merged: Dict[str, Any] = {
-        "recommendations": ["ms-python.pylint"],
-        "unwantedRecommendations": ["GitHub.copilot", "GitHub.copilot-chat"],
-    }
-    _ = path.write_text(json.dumps(merged, indent=2), encoding="utf-8")
-    print(f"✅ Wrote {path.relative_to(vscode_dir.parent)}")
+    report_write(path, write_if_changed(path, _EXTENSIONS_JSON_BYTES), vscode_dir.parent)
 
 
 def write_vscode(repo_root: Path) -> None:
@@ -126,92 +332,58 @@ def write_vscode(repo_root: Path) -> None:
     venv_python: Path = python_in_venv(repo_root)
 
     settings: Dict[str, Any] = {
-        "python.defaultInterpreterPath": str(venv_python).replace(
-            str(repo_root),
-            "${workspaceFolder}"
+        "python.defaultInterpreterPath": (
+            f"${{workspaceFolder}}/{venv_python.relative_to(repo_root).as_posix()}"
         ),
-        "python.terminal.activateEnvironment": True,
-        "terminal.integrated.env.windows": {
-            "VIRTUAL_ENV": "${workspaceFolder}\\.venv",
-            "PATH": "${workspaceFolder}\\.venv\\Scripts;${env:PATH}",
-        },
-        "terminal.integrated.env.osx": {
-            "VIRTUAL_ENV": "${workspaceFolder}/.venv",
-            "PATH": "${workspaceFolder}/.venv/bin:${env:PATH}",
-        },
-        "terminal.integrated.env.linux": {
-            "VIRTUAL_ENV": "${workspaceFolder}/.venv",
-            "PATH": "${workspaceFolder}/.venv/bin:${env:PATH}",
-        },
-        # Copilot restrictions
-        "github.copilot.enable": {
-            "*": False,
-            "plaintext": False,
-            "markdown": False,
-            "scminput": False
-        },
-        "github.copilot.inlineSuggest.enable": False,
-        "github.copilot.nextEditSuggestions.enabled": False,
-        "editor.inlineSuggest.edits.allowCodeShifting": "never",
-        "chat.commandCenter.enabled": False,
-        "chat.agent.enabled": False,
-        "chat.mcp.enabled": False,
-        "github.copilot.chat.enable": False,
-        "github.copilot.chat.codesearch.enabled": False,
-        "github.copilot.chat.editor.temporalContext.enabled": False,
-        "github.copilot.chat.edits.suggestRelatedFilesFromGitHistory": False,
-        "github.copilot.chat.newWorkspaceCreation.enabled": False,
-        "github.copilot.chat.startDebugging.enabled": False,
-        "github.copilot.chat.copilotDebugCommand.enabled": False,
-        "github.copilot.chat.generateTests.codeLens": False,
-        "github.copilot.chat.setupTests.enabled": False,
-        "github.copilot.chat.codeGeneration.useInstructionFiles": False,
-        "chat.promptFiles": False,
-        "chat.modeFilesLocations": {},
-        "workbench.settings.showAISearchToggle": False,
-        "search.searchView.semanticSearchBehavior": "manual",
+        **_BASE_SETTINGS,
     }
 
-    _ = (vscode / "settings.json").write_text(json.dumps(settings, indent=2), encoding="utf-8")
-    print("✅ Wrote .vscode/settings.json")
-
-    launch: Dict[str, Any] = {
-        "version": "0.2.0",
-        "configurations": [
-            {
-                "name": "Python: Current File",
-                "type": "debugpy",
-                "request": "launch",
-                "program": "${file}",
-                "console": "integratedTerminal",
-                "justMyCode": True,
-                "env": {"VIRTUAL_ENV": "${workspaceFolder}/.venv"},
-            }
-        ],
-    }
-    _ = (vscode / "launch.json").write_text(json.dumps(launch, indent=2), encoding="utf-8")
-    print("✅ Wrote .vscode/launch.json")
+    settings_path: Path = vscode / "settings.json"
+    report_write(settings_path, write_if_changed(settings_path, _dumps(settings)), repo_root)
+
+    launch_path: Path = vscode / "launch.json"
+    report_write(launch_path, write_if_changed(launch_path, _LAUNCH_JSON_BYTES), repo_root)
 
     write_extensions_json(vscode)
 
 
 def main() -> None:
     """Main entrypoint: run workspace setup inside an already cloned repo."""
+    # Only needed here; importing them lazily keeps module import cheap.
+    import argparse
+    from concurrent.futures import Future, ThreadPoolExecutor
+
     parser = argparse.ArgumentParser(description="VS Code Python workspace setup")
-    _ = parser.parse_args()
+    _ = parser.add_argument(
+        "--force",
+        action="store_true",
+        help="re-run the requirements install even if requirements.txt is unchanged",
+    )
+    _ = parser.add_argument(
+        "--quick-scan",
+        action="store_true",
+        help="only look for initial_conditions_default.yaml in the repo root and config dirs",
+    )
+    args = parser.parse_args()
 
     repo_root: Optional[Path] = detect_repo_root(Path.cwd())
     if not repo_root:
         sys.exit("Error: Not inside a Git repository.")
 
-    print(f"📁 Working in repo: {repo_root}")
-    ensure_secrets(repo_root)
-    copy_initial_conditions(repo_root)
-    create_venv_and_install(repo_root)
-    write_vscode(repo_root)
+    log(f"📁 Working in repo: {repo_root}")
+    # The tree walk must finish before .venv starts changing underneath it.
+    copy_initial_conditions(repo_root, deep=not args.quick_scan)
+
+    # The venv/pip step dominates wall time and mostly waits on subprocesses;
+    # the remaining steps touch disjoint files, so run them alongside it.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        venv_done: Future[None] = pool.submit(create_venv_and_install, repo_root, args.force)
+        ensure_secrets(repo_root)
+        write_vscode(repo_root)
+        venv_done.result()
 
-    print("\n🎉 Workspace setup complete.")
-    print("Open the folder in VS Code, it should auto-select `.venv` and have Copilot disabled.")
+    log("\n🎉 Workspace setup complete.")
+    log("Open the folder in VS Code, it should auto-select `.venv` and have Copilot disabled.")
 
 
 if __name__ == "__main__":